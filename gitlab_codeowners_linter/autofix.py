@@ -1,10 +1,8 @@
 from __future__ import annotations
 
-from functools import cmp_to_key
-
 from gitlab_codeowners_linter.constants import DEFAULT_SECTION
-from gitlab_codeowners_linter.sorting import sort_paths
-from gitlab_codeowners_linter.sorting import sort_section_names
+from gitlab_codeowners_linter.sorting import path_sort_key
+from gitlab_codeowners_linter.sorting import section_sort_key
 
 
 def fix(codeowners_data, violations, file_path):
@@ -13,10 +11,9 @@ def fix(codeowners_data, violations, file_path):
 
     # Are custom section names sorted?
     if violations.section_names_sorted:
-        sort_sections_names_key = cmp_to_key(sort_section_names)
         sorted_sections_names = sorted(
             codeowners_data[1:],
-            key=sort_sections_names_key,
+            key=section_sort_key,
         )
         codeowners_data_updated = []
         codeowners_data_updated.append(codeowners_data[0])
@@ -95,9 +92,8 @@ def _fix_blank_lines(section):
 def _fix_unsorted_paths(section):
     entries_updated = []
 
-    sort_paths_key = cmp_to_key(sort_paths)
     entries_updated = sorted(
-        section.entries, key=sort_paths_key)
+        section.entries, key=path_sort_key)
     section_updated = section
     section_updated.entries = entries_updated
 
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 import os
-from functools import cmp_to_key
 
 from pathspec import PathSpec
 
-from gitlab_codeowners_linter.sorting import sort_paths
-from gitlab_codeowners_linter.sorting import sort_section_names
+from gitlab_codeowners_linter.sorting import is_sorted
+from gitlab_codeowners_linter.sorting import path_sort_key
+from gitlab_codeowners_linter.sorting import section_sort_key
 
 
 class CodeownersViolations:
@@ -38,8 +38,7 @@ def check(codeowners_data, file_path):
         )
 
     # Are custom section names sorted?
-    sort_sections_names_key = cmp_to_key(sort_section_names)
-    if codeowners_data[1:] != sorted(codeowners_data[1:], key=sort_sections_names_key):
+    if not is_sorted(codeowners_data[1:], key=section_sort_key):
         violations.violation_error_messages.append('Sections are not sorted')
         violations.section_names_sorted = True
 
@@ -120,9 +119,11 @@ def _get_sections_with_blank_lines(codeowners_data):
 
 def _get_unsorted_paths_in_sections(codeowners_data):
     unsorted_sections = []
-    sort_paths_key = cmp_to_key(sort_paths)
     for section in codeowners_data:
-        if sorted(section.entries, key=sort_paths_key) != section.entries:
+        # blank lines are reported and fixed separately, they don't affect the ordering
+        entries = [
+            entry for entry in section.entries if len(entry.path) != 0]
+        if not is_sorted(entries, key=path_sort_key):
             unsorted_sections.append(section.codeowner_section)
     return unsorted_sections
 
@@ -2,42 +2,31 @@ from __future__ import annotations
 
 import re
 
+SECTION_NAME_REGEX = re.compile(r'\[([^]]*)\]')
 
-def sort_paths(entry1, entry2):
-    line1 = entry1.path.lower()
-    line2 = entry2.path.lower()
-    if len(line1) == 0 or len(line2) == 0:
-        return 0
-    if line1.startswith('*') and line2.startswith('*'):
-        return -1 if (line1 < line2) else 1
-    if line1.startswith('*'):
-        return -1
-    if line2.startswith('*'):
-        return 1
-    if line1.startswith('/') and line2.startswith('/'):
-        return -1 if (line1 < line2) else 1
-    if line1.startswith('/'):
-        return 1
-    if line2.startswith('/'):
-        return -1
-
-    return -1 if (line1 < line2) else 1
-
-
-def sort_section_names(section1, section2):
-    section_name1 = re.search(re.compile(
-        r'\[([^]]*)\]'), section1.codeowner_section).group(1).lower()
-    section_name2 = re.search(re.compile(
-        r'\[([^]]*)\]'), section2.codeowner_section).group(1).lower()
-    is_section_1_optional = section1.codeowner_section.startswith('^')
-    is_section_2_optional = section2.codeowner_section.startswith('^')
-
-    if section_name1 == section_name2:
-        if is_section_1_optional and is_section_2_optional:
-            return 0
-        if is_section_1_optional:
-            return -1
-        if is_section_2_optional:
-            return 1
-        return 0
-    return -1 if (section_name1 < section_name2) else 1
+
+def path_sort_key(entry):
+    # Paths starting with * come first, then relative paths,
+    # then paths anchored to the repository root with /
+    line = entry.path.lower()
+    if line.startswith('*'):
+        return (0, line)
+    if line.startswith('/'):
+        return (2, line)
+    return (1, line)
+
+
+def section_sort_key(section):
+    # Sections are sorted by name, optional sections (^[name]) go first
+    # when they share the name with a required one
+    section_name = SECTION_NAME_REGEX.search(
+        section.codeowner_section).group(1).lower()
+    is_section_optional = section.codeowner_section.startswith('^')
+    return (section_name, 0 if is_section_optional else 1)
+
+
+def is_sorted(items, key):
+    # A stable sort leaves the items untouched exactly when their keys
+    # are already in non-decreasing order, so there's no need to sort
+    keys = [key(item) for item in items]
+    return all(previous <= current for previous, current in zip(keys, keys[1:]))
@@ -4,57 +4,123 @@ import os
 import shutil
 import tempfile
 import unittest
-from dataclasses import dataclass
-from functools import cmp_to_key
+from functools import lru_cache
 from pathlib import Path
-from unittest.mock import patch
+from typing import NamedTuple
 
-import gitlab_codeowners_linter  # we need the full import for the mock
+import gitlab_codeowners_linter  # we need the full import to swap checks functions
 from gitlab_codeowners_linter.codeowners_linter import lint_codeowners_file
 from gitlab_codeowners_linter.input import get_arguments
 from gitlab_codeowners_linter.parser import CodeownerEntry
 from gitlab_codeowners_linter.parser import CodeownerSection
-from gitlab_codeowners_linter.sorting import sort_paths
-from gitlab_codeowners_linter.sorting import sort_section_names
+from gitlab_codeowners_linter.sorting import is_sorted
+from gitlab_codeowners_linter.sorting import path_sort_key
+from gitlab_codeowners_linter.sorting import section_sort_key
 
+RESOURCES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'resources',
+)
 
-class Test_Functions(unittest.TestCase):
-    def setUp(self):
-        self.maxDiff = None
-        self.test_dir = tempfile.mkdtemp()
-        self._get_non_existing_paths = gitlab_codeowners_linter.checks._get_non_existing_paths
 
-    def tearDown(self):
-        gitlab_codeowners_linter.checks._get_non_existing_paths = self._get_non_existing_paths
-        shutil.rmtree(self.test_dir)
+class ParserCase(NamedTuple):
+    name: str
+    input: list[str]
+    expected_codeowners_file: str
+    expected_no_autofix: str
 
-    def test_parser(self):
-        @dataclass
-        class TestCase:
-            name: str
-            input: list[str]
-            expected_codeowners_file: str
-            expected_no_autofix: str
 
+class SortCase(NamedTuple):
+    name: str
+    input: list[str]
+    expected: list[str]
+
+
+class IsSortedCase(NamedTuple):
+    name: str
+    input: list[str]
+    expected: bool
+
+
+class AutofixCase(NamedTuple):
+    name: str
+    input: Path
+    expected_check: list[str]
+    expected_fix: Path
+
+
+def _no_non_existing_paths(codeowners_data):
+    return [], []
+
+
+# scratch directory shared by the whole module, see setUpModule
+test_dir = None
+
+
+@lru_cache(maxsize=None)
+def _lint_fixture(input_path, mtime_ns, get_non_existing_paths):
+    # mtime_ns and the _get_non_existing_paths in use are only part of the
+    # cache key: the result is recomputed if the fixture or the stub change
+    actual = os.path.join(test_dir, 'actual_input.txt')
+    shutil.copyfile(input_path, actual)
+    violations = lint_codeowners_file(actual, False)
+    return tuple(violations.violation_error_messages), Path(actual).read_bytes()
+
+
+def lint_fixture(input_path):
+    """
+    Lint a copy of a fixture file with autofix enabled and return
+    the violation messages and the autofixed content.
+    Results are cached by fixture path, fixture mtime and the
+    checks._get_non_existing_paths in use: a test that patches any
+    other checks or autofix function must call _lint_fixture.cache_clear()
+    """
+    violations, content = _lint_fixture(
+        input_path,
+        os.stat(input_path).st_mtime_ns,
+        gitlab_codeowners_linter.checks._get_non_existing_paths,
+    )
+    return list(violations), content
+
+
+@lru_cache(maxsize=None)
+def expected_fix_content(expected_fix_path):
+    return Path(expected_fix_path).read_bytes()
+
+
+def setUpModule():
+    global test_dir
+    # one scratch directory for the module, every fixture overwrites the same file
+    test_dir = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(test_dir)
+
+
+class Test_Functions(unittest.TestCase):
+    maxDiff = None
+
+    def test_parser(self):
         testcases = [
-            TestCase(
+            ParserCase(
                 name='regular_input',
                 input=['--codeowners_file', 'CODEOWNERS'],
                 expected_codeowners_file='CODEOWNERS',
                 expected_no_autofix='False'),
-            TestCase(
+            ParserCase(
                 name='trailing_paths_input_ignored',
                 input=['.gitlab/CODEOWNERS', '--codeowners_file',
                        'CODEOWNERS', 'path/1', 'path/2'],
                 expected_codeowners_file='CODEOWNERS',
                 expected_no_autofix='False'),
-            TestCase(
+            ParserCase(
                 name='trailing_paths_input_and_no_fix',
                 input=['.gitlab/CODEOWNERS', 'path/to/CODEOWNERS',
                        'path/1', 'path/2', '--no_autofix', 'path/3'],
                 expected_codeowners_file='.gitlab/CODEOWNERS',
                 expected_no_autofix='True'),
-            TestCase(
+            ParserCase(
                 name='positional_paths_wrong_input_and_no_fix',
                 input=['.gitlab/wrong/CODEOWNERS', 'path/to/CODEOWNERS',
                        'path/1', 'path/2', '--no_autofix', 'path/3'],
@@ -63,26 +129,15 @@ class Test_Functions(unittest.TestCase):
         ]
 
         for case in testcases:
-            codeowners_file, no_autofix = get_arguments(case.input)
-            self.assertEqual(str(codeowners_file),
-                             case.expected_codeowners_file, 'failed test {} expected {}, actual {}'.format(
-                case.name,
-                case.expected_codeowners_file,
-                codeowners_file,))
-            self.assertEqual(str(no_autofix), case.expected_no_autofix, 'failed test {} expected {}, actual {}'.format(
-                case.name,
-                case.expected_no_autofix,
-                no_autofix,))
+            with self.subTest(case.name):
+                codeowners_file, no_autofix = get_arguments(case.input)
+                self.assertEqual(str(codeowners_file),
+                                 case.expected_codeowners_file)
+                self.assertEqual(str(no_autofix), case.expected_no_autofix)
 
     def test_sort_sections_function(self):
-        @dataclass
-        class TestCase:
-            name: str
-            input: list[str]
-            expected: list[str]
-
         testcases = [
-            TestCase(
+            SortCase(
                 name='unsorted',
                 input=[
                     '[BUILD]',
@@ -99,8 +154,8 @@ class Test_Functions(unittest.TestCase):
                     '[SYSTEM]',
                 ],
             ),
-            TestCase(name='empty_slice', input=[], expected=[]),
-            TestCase(
+            SortCase(name='empty_slice', input=[], expected=[]),
+            SortCase(
                 name='already_sorted',
                 input=[
                     '^[And_a_last_section]',
@@ -118,34 +173,21 @@ class Test_Functions(unittest.TestCase):
                 ],
             ),
         ]
-        sort_section_key = cmp_to_key(sort_section_names)
 
         for case in testcases:
-            data = []
-            actual = data
-            for section in case.input:
-                data.append(CodeownerSection(section, [], []))
-            actual = sorted(data, key=sort_section_key)
-            actual_names = [x.codeowner_section for x in actual]
-            self.assertListEqual(
-                case.expected,
-                actual_names,
-                'failed test {} expected {}, actual {}'.format(
-                    case.name,
+            with self.subTest(case.name):
+                data = [CodeownerSection(section, [], [])
+                        for section in case.input]
+                actual = sorted(data, key=section_sort_key)
+                actual_names = [x.codeowner_section for x in actual]
+                self.assertListEqual(
                     case.expected,
                     actual_names,
-                ),
-            )
+                )
 
     def test_sort_path_function(self):
-        @dataclass
-        class TestCase:
-            name: str
-            input: list[str]
-            expected: list[str]
-
         testcases = [
-            TestCase(
+            SortCase(
                 name='unsorted',
                 input=[
                     '*.md test@email.com',
@@ -182,8 +224,8 @@ class Test_Functions(unittest.TestCase):
                     '/www/gitlab/test/pa test@email.com #this is a comment',
                 ],
             ),
-            TestCase(name='empty_slice', input=[], expected=[]),
-            TestCase(
+            SortCase(name='empty_slice', input=[], expected=[]),
+            SortCase(
                 name='already_sorted',
                 input=[
                     '* test@email.com',
@@ -217,136 +259,144 @@ class Test_Functions(unittest.TestCase):
                 ],
             ),
         ]
-        sort_paths_key = cmp_to_key(sort_paths)
 
         for case in testcases:
-            data = CodeownerSection('Test', [], [])
-            actual = data
-            for path in case.input:
-                data.entries.append(CodeownerEntry(path, ''))
-            actual.entries = sorted(data.entries, key=sort_paths_key)
-            self.assertListEqual(
-                case.expected,
-                actual.get_paths(),
-                'failed test {} expected {}, actual {}'.format(
-                    case.name,
+            with self.subTest(case.name):
+                actual = CodeownerSection(
+                    'Test', [], [CodeownerEntry(path, '') for path in case.input])
+                actual.entries = sorted(actual.entries, key=path_sort_key)
+                self.assertListEqual(
                     case.expected,
                     actual.get_paths(),
-                ),
-            )
+                )
 
-    def test_non_existing_path_autofix(self):
+    def test_is_sorted_function(self):
+        testcases = [
+            IsSortedCase(
+                name='unsorted',
+                input=['/ui', '*.md', '.gitlab', '/ui/components/'],
+                expected=False,
+            ),
+            IsSortedCase(name='empty_slice', input=[], expected=True),
+            IsSortedCase(
+                name='already_sorted_with_duplicates',
+                input=['*.md', '.gitlab', '/ui', '/ui', '/ui/components/'],
+                expected=True,
+            ),
+        ]
 
-        @dataclass
-        class TestCase:
-            name: str
-            input: Path
-            expected_check: list[str]
-            expected_fix: Path
+        for case in testcases:
+            with self.subTest(case.name):
+                data = [CodeownerEntry(path, '') for path in case.input]
+                actual = is_sorted(data, key=path_sort_key)
+                self.assertEqual(
+                    case.expected,
+                    actual,
+                )
 
+    def test_is_sorted_sections_function(self):
         testcases = [
-            TestCase(
+            IsSortedCase(
+                name='optional_before_required',
+                input=['^[SYSTEM]', '[SYSTEM]'],
+                expected=True,
+            ),
+            IsSortedCase(
+                name='optional_after_required',
+                input=['[SYSTEM]', '^[SYSTEM]'],
+                expected=False,
+            ),
+            IsSortedCase(
+                name='mixed_case',
+                input=['^[And_a_last_section]', '[build]', '[SECURITY]', '[system]'],
+                expected=True,
+            ),
+            IsSortedCase(
+                name='mixed_case_unsorted',
+                input=['[security]', '[BUILD]'],
+                expected=False,
+            ),
+            IsSortedCase(name='empty_slice', input=[], expected=True),
+        ]
+
+        for case in testcases:
+            with self.subTest(case.name):
+                data = [CodeownerSection(section, [], [])
+                        for section in case.input]
+                actual = is_sorted(data, key=section_sort_key)
+                self.assertEqual(
+                    case.expected,
+                    actual,
+                )
+
+    def test_non_existing_path_autofix(self):
+        testcases = [
+            AutofixCase(
                 name='already_formatted',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/existing_paths_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'existing_paths_input.txt'),
                 expected_check=[
                     'Sections are not sorted',
                     'The sections [SECURITY], [security] are duplicates',
                     'The paths in sections __default_codeowner_section__, [Security], [SYSTEM], [SECURITY] are not sorted',
                     'The sections __default_codeowner_section__ have duplicate paths',
                     'The sections __default_codeowner_section__, [Security], [SYSTEM], [SECURITY], [security] have non-existing paths'],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/existing_paths_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'existing_paths_autofix.txt'),
             ),
         ]
         for case in testcases:
-            actual = os.path.join(
-                self.test_dir,
-                'actual_input.txt',
-            )
-            shutil.copyfile(case.input, actual)
-            violations = lint_codeowners_file(actual, False)
-            self.assertEqual(violations.violation_error_messages, case.expected_check, 'failed autofix feature for test {} expected {}, actual {}'.format(
-                case.name,
-                case.expected_fix,
-                actual,
-            ))
-            with open(actual) as input, open(case.expected_fix) as expected_output:
-                self.assertListEqual(
-                    list(input),
-                    list(expected_output),
-                    'failed autofix feature for test {} expected {}, actual {}'.format(
-                        case.name,
-                        case.expected_fix,
-                        actual,
-                    ),
-                )
+            with self.subTest(case.name):
+                violations, actual = lint_fixture(case.input)
+                self.assertEqual(violations, case.expected_check)
+                expected = expected_fix_content(case.expected_fix)
+                if actual != expected:
+                    # compare line by line only on failure, to get a readable diff
+                    self.assertListEqual(
+                        actual.decode().splitlines(keepends=True),
+                        expected.decode().splitlines(keepends=True),
+                        'failed autofix feature for test {} input {}, expected {}'.format(
+                            case.name,
+                            case.input,
+                            case.expected_fix,
+                        ),
+                    )
 
 
 class Test_Autofix(unittest.TestCase):
+    maxDiff = None
 
-    def setUp(self):
-        self.maxDiff = None
-        self.test_dir = tempfile.mkdtemp()
-        self._get_non_existing_paths = gitlab_codeowners_linter.checks._get_non_existing_paths
+    @classmethod
+    def setUpClass(cls):
+        cls._get_non_existing_paths = gitlab_codeowners_linter.checks._get_non_existing_paths
 
-    def tearDown(self):
-        gitlab_codeowners_linter.checks._get_non_existing_paths = self._get_non_existing_paths
-        shutil.rmtree(self.test_dir)
+    @classmethod
+    def tearDownClass(cls):
+        gitlab_codeowners_linter.checks._get_non_existing_paths = cls._get_non_existing_paths
 
     def test_autofix_feature(self):
-        patcher = patch(
-            'gitlab_codeowners_linter.checks._get_non_existing_paths')
-        mock_thing = patcher.start()
-        mock_thing.return_value = [], []
-
-        @dataclass
-        class TestCase:
-            name: str
-            input: Path
-            expected_check: list[str]
-            expected_fix: Path
+        # tearDownClass restores the original function
+        gitlab_codeowners_linter.checks._get_non_existing_paths = _no_non_existing_paths
 
         testcases = [
-            TestCase(
+            AutofixCase(
                 name='already_formatted',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/formatted_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'formatted_input.txt'),
                 expected_check=[],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/formatted_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'formatted_autofix.txt'),
             ),
-            TestCase(
+            AutofixCase(
                 name='not_formatted',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/unformatted_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'unformatted_input.txt'),
                 expected_check=[
                     'Sections are not sorted',
                     'There are blank lines in the sections __default_codeowner_section__, [BUILD], [SECURITY]',
                     'The paths in sections __default_codeowner_section__, [BUILD], [SYSTEM], [TEST_SECTION] are not sorted',
                     'The sections __default_codeowner_section__ have duplicate paths',
                 ],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/unformatted_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'unformatted_autofix.txt'),
             ),
-            TestCase(
+            AutofixCase(
                 name='not_formatted_no_default_section',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/no_default_section_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'no_default_section_input.txt'),
                 expected_check=[
                     'Sections are not sorted',
                     'The sections [SECTION_NAME], [section_name], [Section_Name] are duplicates',
@@ -354,76 +404,58 @@ class Test_Autofix(unittest.TestCase):
                     'The paths in sections [Section_name], [BUILD], [SYSTEM], [SECTION_NAME], [TEST_SECTION] are not sorted',
                     'The sections [Section_name], [SECTION_NAME] have duplicate paths',
                 ],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/no_default_section_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'no_default_section_autofix.txt'),
             ),
-            TestCase(
+            AutofixCase(
                 name='optional_sections_not_formatted',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/optional_sections_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'optional_sections_input.txt'),
                 expected_check=[
                     'Sections are not sorted',
                     'The sections [System], [SYSTEM], [SYSTEM] are duplicates',
 
                 ],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/optional_sections_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'optional_sections_autofix.txt'),
             ),
-            TestCase(
+            AutofixCase(
                 name='empty_file',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/empty_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'empty_input.txt'),
                 expected_check=[],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/empty_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'empty_autofix.txt'),
             ),
-            TestCase(
+            AutofixCase(
                 name='trailing_whitespace',
-                input=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/trailing_whitespace_input.txt',
-                ),
+                input=os.path.join(RESOURCES, 'trailing_whitespace_input.txt'),
                 expected_check=[
                     'Lines with trailing whitespace: [6, 8]',
                 ],
-                expected_fix=os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'resources/trailing_whitespace_autofix.txt',
-                ),
+                expected_fix=os.path.join(RESOURCES, 'trailing_whitespace_autofix.txt'),
+            ),
+            AutofixCase(
+                name='blank_line_between_unsorted_paths',
+                input=os.path.join(RESOURCES, 'blank_line_unsorted_input.txt'),
+                expected_check=[
+                    'There are blank lines in the sections [BUILD], [SECURITY]',
+                    'The paths in sections [BUILD] are not sorted',
+                ],
+                expected_fix=os.path.join(RESOURCES, 'blank_line_unsorted_autofix.txt'),
             ),
         ]
         for case in testcases:
-            actual = os.path.join(
-                self.test_dir,
-                'actual_input.txt',
-            )
-            shutil.copyfile(case.input, actual)
-            violations = lint_codeowners_file(actual, False)
-            self.assertEqual(violations.violation_error_messages, case.expected_check, 'failed autofix feature for test {} expected {}, actual {}'.format(
-                case.name,
-                case.expected_fix,
-                actual,
-            ),)
-            with open(actual) as input, open(case.expected_fix) as expected_output:
-                self.assertListEqual(
-                    list(input),
-                    list(expected_output),
-                    'failed autofix feature for test {} expected {}, actual {}'.format(
-                        case.name,
-                        case.expected_fix,
-                        actual,
-                    ),
-                )
+            with self.subTest(case.name):
+                violations, actual = lint_fixture(case.input)
+                self.assertEqual(violations, case.expected_check)
+                expected = expected_fix_content(case.expected_fix)
+                if actual != expected:
+                    # compare line by line only on failure, to get a readable diff
+                    self.assertListEqual(
+                        actual.decode().splitlines(keepends=True),
+                        expected.decode().splitlines(keepends=True),
+                        'failed autofix feature for test {} input {}, expected {}'.format(
+                            case.name,
+                            case.input,
+                            case.expected_fix,
+                        ),
+                    )
 
 
 if __name__ == '__main__':